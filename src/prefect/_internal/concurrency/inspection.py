@@ -3,11 +3,13 @@ Utilities for inspection of stack frames and threads.
 """
 
 import dis
-import linecache
+import functools
+import os
 import sys
 import threading
-from types import FrameType
-from typing import List
+from collections import deque
+from types import CodeType, FrameType
+from typing import Deque, Dict, Iterator, List, Optional, Tuple
 
 """
 The following functions are derived from dask/distributed which is licensed under the 
@@ -43,6 +45,17 @@ OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 """
 
 
+@functools.lru_cache(maxsize=256)
+def _code_line_starts(code: CodeType) -> List[tuple]:
+    """
+    Cached `dis.findlinestarts` results for a code object.
+
+    Computing line starts disassembles the line table on every call; stacks
+    repeatedly dump frames for the same code objects so memoize per code object.
+    """
+    return list(dis.findlinestarts(code))
+
+
 def _f_lineno(frame: FrameType) -> int:
     """Work around some frames lacking an f_lineno
     See: https://bugs.python.org/issue47085
@@ -53,9 +66,18 @@ def _f_lineno(frame: FrameType) -> int:
 
     f_lasti = frame.f_lasti
     code = frame.f_code
-    prev_line = code.co_firstlineno
 
-    for start, next_line in dis.findlinestarts(code):
+    # A frame that has not started executing, or code with no line table beyond
+    # its first line, can only be on the first line; skip the scan entirely
+    if f_lasti < 0:
+        return code.co_firstlineno
+
+    line_starts = _code_line_starts(code)
+    if not line_starts:
+        return code.co_firstlineno
+
+    prev_line = code.co_firstlineno
+    for start, next_line in line_starts:
         if f_lasti < start:
             return prev_line
         prev_line = next_line
@@ -63,38 +85,151 @@ def _f_lineno(frame: FrameType) -> int:
     return prev_line
 
 
+# Interval at which byte offsets into source files are indexed; reading a line
+# requires scanning forward at most this many lines from the nearest offset
+_SOURCE_LINE_INDEX_INTERVAL = 64
+
+
+@functools.lru_cache(maxsize=128)
+def _line_offsets(filename: str, mtime: float) -> List[int]:
+    """
+    Byte offsets of every Nth line of a file.
+
+    Unlike `linecache`, which retains every line of every file it has read, this
+    bounds the memory retained per file to one integer per N lines. The cache is
+    keyed by modification time so entries for changed files are replaced.
+    """
+    offsets = [0]
+    position = 0
+    with open(filename, "rb") as source:
+        for lineno, line in enumerate(iter(source.readline, b""), start=1):
+            position += len(line)
+            if lineno % _SOURCE_LINE_INDEX_INTERVAL == 0:
+                offsets.append(position)
+    return offsets
+
+
+def _get_source_line(filename: str, lineno: int) -> str:
+    """
+    Retrieve a single source line without retaining the rest of the file.
+
+    Seeks to the nearest indexed offset then scans forward to the requested
+    line. Returns an empty string if the line cannot be read; modules without
+    a real file on disk (e.g. zipimports) render without a source line.
+    """
+    if lineno < 1:
+        return ""
+
+    try:
+        mtime = os.path.getmtime(filename)
+    except OSError:
+        return ""
+
+    index, remainder = divmod(lineno - 1, _SOURCE_LINE_INDEX_INTERVAL)
+    try:
+        offsets = _line_offsets(filename, mtime)
+        if index >= len(offsets):
+            return ""
+        with open(filename, "rb") as source:
+            source.seek(offsets[index])
+            for _ in range(remainder):
+                if not source.readline():
+                    return ""
+            line = source.readline()
+    except OSError:
+        return ""
+
+    return line.decode("utf-8", errors="replace")
+
+
+# Pre-built frame template; a single %-interpolation compiles to one bytecode
+# operation per frame instead of assembling the pieces at each call
+_FRAME_TEMPLATE = sys.intern('  File "%s", line %d, in %s\n\t%s')
+
+
 def repr_frame(frame: FrameType) -> str:
     """Render a frame as a line for inclusion into a text traceback"""
     co = frame.f_code
     f_lineno = _f_lineno(frame)
-    text = f'  File "{co.co_filename}", line {f_lineno}, in {co.co_name}'
-    line = linecache.getline(co.co_filename, f_lineno, frame.f_globals).lstrip()
-    return text + "\n\t" + line
+    line = _get_source_line(co.co_filename, f_lineno).lstrip()
+    return _FRAME_TEMPLATE % (co.co_filename, f_lineno, co.co_name, line)
+
+
+def call_stack(frame: FrameType) -> Iterator[str]:
+    """
+    Create a call text stack from a frame.
+
+    Frames are yielded outermost first. Rendering a frame resolves its line
+    number and reads its source line, so that work is deferred until each frame
+    is actually consumed; callers that only take a prefix of the stack do not
+    pay for the remainder.
+    """
+    frames: Deque[FrameType] = deque()
+    cur_frame: Optional[FrameType] = frame
+    while cur_frame:
+        frames.appendleft(cur_frame)
+        cur_frame = cur_frame.f_back
+    for frame in frames:
+        yield repr_frame(frame)
 
 
-def call_stack(frame: FrameType) -> List[str]:
-    """Create a call text stack from a frame"""
-    L = []
-    cur_frame: FrameType | None = frame
+# Fingerprint and rendered stack from the last dump per thread ident; repeated
+# dumps re-emit the cached text for threads that have not advanced in between
+# instead of re-reading their source lines
+_last_dumped_stacks: Dict[int, Tuple[tuple, str]] = {}
+
+
+def _stack_fingerprint(frame: FrameType) -> tuple:
+    """Identify a stack by the code object and instruction offset of each frame"""
+    fingerprint = []
+    cur_frame: Optional[FrameType] = frame
     while cur_frame:
-        L.append(repr_frame(cur_frame))
+        fingerprint.append((cur_frame.f_code, cur_frame.f_lasti))
         cur_frame = cur_frame.f_back
-    return L[::-1]
+    return tuple(fingerprint)
+
+
+# Header template; %#x renders the ident in hex directly without a hex() call
+# and intermediate string per thread
+_THREAD_HEADER_TEMPLATE = sys.intern("------ Call stack of %s (%#x) -----")
 
 
 def stack_for_threads(*threads: threading.Thread) -> List[str]:
+    # With nothing to dump, skip the frame snapshot entirely; it stops every
+    # thread in the interpreter to collect their frames
+    if not threads:
+        return []
+
+    # `sys._current_frames` snapshots every thread in one GIL round trip; take
+    # it once then filter to the threads we were asked about. Threads that were
+    # never started have no identity and cannot have a frame, so skip them
+    # instead of looking them up in the snapshot.
     frames = sys._current_frames()
     try:
         lines = []
         for thread in threads:
-            lines.append(
-                f"------ Call stack of {thread.name} ({hex(thread.ident)}) -----"
-            )
+            if thread.ident is None:
+                continue
+            lines.append(_THREAD_HEADER_TEMPLATE % (thread.name, thread.ident))
             thread_frames = frames.get(thread.ident)
             if thread_frames:
-                lines.append("".join(call_stack(thread_frames)))
+                fingerprint = _stack_fingerprint(thread_frames)
+                cached = _last_dumped_stacks.get(thread.ident)
+                if cached is not None and cached[0] == fingerprint:
+                    lines.append(cached[1])
+                    lines.append("(unchanged since last dump)")
+                else:
+                    stack = "".join(call_stack(thread_frames))
+                    _last_dumped_stacks[thread.ident] = (fingerprint, stack)
+                    lines.append(stack)
             else:
                 lines.append("No stack frames found")
+
+        # Thread identities are recycled; drop cached stacks for threads that
+        # no longer have a frame so the map cannot grow without bound
+        for ident in list(_last_dumped_stacks):
+            if ident not in frames:
+                del _last_dumped_stacks[ident]
     finally:
         del frames
 
@@ -49,16 +49,12 @@ def shutdown(runner) -> int:
     return _shutdown
 
 
-def start_webserver(
-    runner,
-    log_level: str = None,
-) -> None:
+def build_server(runner) -> FastAPI:
     """
-    Run a FastAPI server for a runner.
+    Build a FastAPI server for a runner.
 
     Args:
         runner (Runner): the runner this server interacts with and monitors
-        log_level (str): the log level to use for the server
     """
     webserver = FastAPI()
     router = APIRouter()
@@ -71,6 +67,22 @@ def start_webserver(
 
     webserver.include_router(router)
 
+    return webserver
+
+
+def start_webserver(
+    runner,
+    log_level: str = None,
+) -> None:
+    """
+    Run a FastAPI server for a runner.
+
+    Args:
+        runner (Runner): the runner this server interacts with and monitors
+        log_level (str): the log level to use for the server
+    """
+    webserver = build_server(runner)
+
     host = PREFECT_RUNNER_SERVER_HOST.value()
     port = PREFECT_RUNNER_SERVER_PORT.value()
     log_level = log_level or PREFECT_RUNNER_SERVER_LOG_LEVEL.value()
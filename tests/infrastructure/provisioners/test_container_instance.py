@@ -1,88 +1,375 @@
+import functools
 import json
-import subprocess
+import sys
+from collections import deque
+from copy import deepcopy
 from subprocess import CalledProcessError
-from typing import Optional
-from unittest.mock import AsyncMock, MagicMock, call
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Final, Optional
+from unittest.mock import AsyncMock, call
 
 import pytest
 
 from prefect._internal.pydantic import HAS_PYDANTIC_V2
 from prefect.blocks.core import Block
 from prefect.blocks.fields import SecretDict
-from prefect.client.orchestration import PrefectClient
-from prefect.client.schemas.actions import BlockDocumentCreate
-from prefect.infrastructure.provisioners.container_instance import (
-    ContainerInstancePushProvisioner,
-)
+
+# The provisioner and client modules pull in large parts of Prefect; import
+# them inside the fixtures that need them so collecting (or deselecting) this
+# file does not pay for them
+if TYPE_CHECKING:
+    from prefect.client.orchestration import PrefectClient
+    from prefect.infrastructure.provisioners.container_instance import (
+        ContainerInstancePushProvisioner,
+    )
 
 if HAS_PYDANTIC_V2:
     from pydantic.v1 import Field
 else:
     from pydantic import Field
 
+# Command strings asserted against repeatedly across the module; interned so
+# the string comparisons inside mock call equality fast-path on identity
+APP_ID: Final = sys.intern("bcbeb824-fc3a-41f7-afc0-fc00297c1355")
+AZ_VERSION_CMD: Final = sys.intern("az --version")
+ACCOUNT_LIST_CMD: Final = sys.intern("az account list --output json")
+LIST_LOCATIONS_CMD: Final = sys.intern(
+    'az account list-locations --query "[?isDefault].name" --output tsv'
+)
+APP_LIST_CMD: Final = sys.intern(
+    "az ad app list --display-name prefect-aci-push-pool-app --output json"
+)
+
+# Identifiers repeated throughout the mock payloads and expected commands
+SUB_ID: Final = sys.intern("12345678-1234-1234-1234-123456789012")
+SP_OBJECT_ID: Final = sys.intern("abf1b3a0-1b1b-4c1c-9c9c-1c1c1c1c1c1c")
+RG_SCOPE: Final = sys.intern(
+    f"/subscriptions/{SUB_ID}/resourceGroups/prefect-aci-push-pool-rg"
+)
 
-@pytest.fixture
-async def existing_credentials_block(prefect_client: PrefectClient):
-    block_type = await prefect_client.read_block_type_by_slug(
-        slug="azure-container-instance-credentials"
+# Shared read-only mock payloads returned by the mocked Azure CLI; built once
+# per module and wrapped in MappingProxyType so no test can mutate them for
+# the others
+SUBSCRIPTIONS_LIST = (
+    MappingProxyType(
+        {
+            "cloudName": "AzureCloud",
+            "id": "12345678-1234-1234-1234-123456789012",
+            "isDefault": True,
+            "name": "None",
+            "state": "Enabled",
+            "tenantId": "12345678-1234-1234-1234-123456789012",
+        }
+    ),
+)
+
+# Variant of the subscription payload with a real subscription name, used by
+# the end-to-end provision tests
+PROVISION_SUBSCRIPTIONS_LIST = (
+    MappingProxyType(
+        {
+            "cloudName": "AzureCloud",
+            "id": "12345678-1234-1234-1234-123456789012",
+            "isDefault": True,
+            "name": "subscription_1",
+            "state": "Enabled",
+            "tenantId": "12345678-1234-1234-1234-123456789012",
+        }
+    ),
+)
+
+APP_REGISTRATION = MappingProxyType(
+    {
+        "appId": "12345678-1234-1234-1234-123456789012",
+        "displayName": "prefect-aci-push-pool-app",
+        "identifierUris": ["https://prefect-aci-push-pool-app"],
+    }
+)
+
+SERVICE_PRINCIPAL = (
+    MappingProxyType(
+        {
+            "accountEnabled": True,
+            "addIns": [],
+            "alternativeNames": [],
+            "appDescription": None,
+            "appDisplayName": "prefect-aci-push-pool-app",
+            "appId": "bcbeb824-fc3a-41f7-afc0-fc00297c1355",
+        }
+    ),
+)
+
+NEW_SERVICE_PRINCIPAL = (
+    MappingProxyType(
+        {
+            "id": "abf1b3a0-1b1b-4c1c-9c9c-1c1c1c1c1c1c",
+            "accountEnabled": True,
+            "addIns": [],
+            "alternativeNames": [],
+            "appDescription": None,
+            "appDisplayName": "prefect-aci-push-pool-app",
+            "appId": "bcbeb824-fc3a-41f7-afc0-fc00297c1355",
+        }
+    ),
+)
+
+CLIENT_SECRET = MappingProxyType(
+    {
+        "appId": "5407b48a-a28d-49ea-a740-54504847153f",
+        "password": "<MY_SECRET>",
+        "tenant": "9ee4947a-f114-4939-a5ac-7f0ed786de36",
+    }
+)
+
+ROLE_ASSIGNMENT = MappingProxyType(
+    {
+        "roleDefinitionName": "Contributor",
+    }
+)
+
+
+@functools.lru_cache(maxsize=None)
+def _service_principal_calls(app_id):
+    """
+    Expected CLI calls for `_get_or_create_service_principal_object_id`:
+    list, create, then list again. Compiled once per app ID; callers slice
+    off the prefix they need.
+    """
+    sp_list_cmd = sys.intern(
+        f"az ad sp list --all --query \"[?appId=='{app_id}']\" --output json"
     )
-    block_schema = await prefect_client.get_most_recent_block_schema_for_block_type(
-        block_type_id=block_type.id
+    return (
+        call(
+            sp_list_cmd,
+            return_json=True,
+        ),
+        call(
+            sys.intern(f"az ad sp create --id {app_id}"),
+            success_message=f"Service principal created for app ID '{app_id}'",
+            failure_message=f"Failed to create service principal for app ID '{app_id}'",
+        ),
+        call(
+            sp_list_cmd,
+            failure_message=(
+                f"Failed to retrieve new service principal for app ID {app_id}"
+            ),
+            return_json=True,
+        ),
     )
-    assert block_schema is not None
-
-    block_document = await prefect_client.create_block_document(
-        block_document=BlockDocumentCreate(
-            name="test-work-pool-push-pool-credentials",
-            data={
-                "client_id": "12345678-1234-1234-1234-123456789012",
-                "tenant_id": "9ee4947a-f114-4939-a5ac-7f0ed786de36",
-                "client_secret": "<MY_SECRET>",
-            },
-            block_type_id=block_type.id,
-            block_schema_id=block_schema.id,
+
+
+@functools.lru_cache(maxsize=None)
+def _expected_provision_calls(include_secret_generation):
+    """
+    The full expected `run_command` history for a successful provision run.
+
+    The two provision tests differ only in whether a client secret is
+    generated for the app registration (no secret is generated when a
+    credentials block already exists), so the sequence is built once per
+    variant and shared across runs.
+    """
+    calls = [
+        # _verify_az_ready
+        call(AZ_VERSION_CMD, ignore_if_exists=True),
+        call(ACCOUNT_LIST_CMD, return_json=True),
+        # _select_subscription
+        call(
+            ACCOUNT_LIST_CMD,
+            failure_message=(
+                "No Azure subscriptions found. Please create an Azure subscription and"
+                " try again."
+            ),
+            ignore_if_exists=True,
+            return_json=True,
+        ),
+        # _set_location
+        call(LIST_LOCATIONS_CMD),
+        # _create_resource_group
+        call(
+            f"az group exists --name prefect-aci-push-pool-rg --subscription {SUB_ID}",
+            return_json=True,
+        ),
+        call(
+            (
+                "az group create --name 'prefect-aci-push-pool-rg' --location 'westus'"
+                f" --subscription '{SUB_ID}'"
+            ),
+            success_message=(
+                "Resource group 'prefect-aci-push-pool-rg' created successfully"
+            ),
+            failure_message=(
+                "Failed to create resource group 'prefect-aci-push-pool-rg' in"
+                " subscription 'subscription_1'"
+            ),
+            ignore_if_exists=True,
+        ),
+        # _create_app_registration
+        call(APP_LIST_CMD),
+        call(
+            "az ad app create --display-name prefect-aci-push-pool-app --output json",
+            success_message=(
+                "App registration 'prefect-aci-push-pool-app' created successfully"
+            ),
+            failure_message=(
+                "Failed to create app registration with name"
+                " 'prefect-aci-push-pool-app'"
+            ),
+            ignore_if_exists=True,
+        ),
+    ]
+
+    if include_secret_generation:
+        # _create secret
+        calls.append(
+            call(
+                f"az ad app credential reset --id {SUB_ID} --append --output json",
+                success_message=(
+                    f"Secret generated for app registration with client ID '{SUB_ID}'"
+                ),
+                failure_message=(
+                    "Failed to generate secret for app registration with client ID"
+                    f" '{SUB_ID}'. If you have already generated 2 secrets for this"
+                    " app registration, please delete one from the"
+                    " `prefect-aci-push-pool-app` resource and try again."
+                ),
+                ignore_if_exists=True,
+                return_json=True,
+            )
         )
+
+    calls += [
+        # _create_service_principal
+        *_service_principal_calls(SUB_ID),
+        # _assign_contributor_role
+        call(
+            (
+                f"az role assignment list --assignee {SP_OBJECT_ID} --role Contributor"
+                f" --scope {RG_SCOPE} --output json"
+            ),
+            return_json=True,
+        ),
+        call(
+            (
+                "az role assignment create --role Contributor --assignee-object-id"
+                f" {SP_OBJECT_ID} --scope {RG_SCOPE}"
+            ),
+            success_message=(
+                "Contributor role assigned to service principal with object ID"
+                f" '{SP_OBJECT_ID}'"
+            ),
+            failure_message=(
+                "Failed to assign Contributor role to service principal with object ID"
+                f" '{SP_OBJECT_ID}'"
+            ),
+            ignore_if_exists=True,
+        ),
+        # _create_container_instance
+        call(
+            (
+                "az container list --resource-group prefect-aci-push-pool-rg"
+                f" --subscription {SUB_ID} --query"
+                " \"[?name=='prefect-aci-push-pool-container']\" --output json"
+            ),
+            return_json=True,
+        ),
+        call(
+            (
+                "az container create --name prefect-aci-push-pool-container"
+                " --resource-group prefect-aci-push-pool-rg --image"
+                " docker.io/prefecthq/prefect:2-latest --location westus --subscription"
+                f" {SUB_ID} --restart-policy OnFailure --output json"
+            ),
+            success_message=(
+                "Container instance 'prefect-aci-push-pool-container' created"
+                " successfully in resource group 'prefect-aci-push-pool-rg' in location"
+                " 'westus' in subscription 'subscription_1'"
+            ),
+            failure_message=(
+                "Failed to create container instance 'prefect-aci-push-pool-container'"
+                " in resource group 'prefect-aci-push-pool-rg' in location 'westus' in"
+                " subscription 'subscription_1'"
+            ),
+            ignore_if_exists=True,
+        ),
+    ]
+
+    return tuple(calls)
+
+
+@pytest.fixture(scope="session")
+async def default_base_job_template_raw():
+    # Call the generator behind `prefect work-pool get-default-base-job-template`
+    # directly instead of forking a CLI subprocess; run once per session and let
+    # the per-test fixture parse a fresh copy from the cached output.
+    # Session caches in this module are plain in-memory values, so under
+    # pytest-xdist each worker builds its own copy and nothing is shared
+    # between processes.
+    from prefect.workers.utilities import (
+        get_default_base_job_template_for_infrastructure_type,
     )
 
-    yield block_document.id
+    template = await get_default_base_job_template_for_infrastructure_type(
+        "azure-container-instance"
+    )
+
+    if template is None:
+        pytest.fail(
+            "Failed to fetch default base job template for azure-container-instance"
+        )
+    return json.dumps(template)
+
 
-    await prefect_client.delete_block_document(block_document_id=block_document.id)
+@functools.lru_cache(maxsize=None)
+def _parse_base_job_template(raw):
+    return json.loads(raw)
 
 
 @pytest.fixture
-def default_base_job_template():
-    command = [
-        "prefect",
-        "work-pool",
-        "get-default-base-job-template",
-        "--type",
-        "azure-container-instance",
-    ]
+def default_base_job_template(default_base_job_template_raw):
+    # Parse the cached JSON once and hand each test a deep copy; the template
+    # cannot be frozen because `provision` and the tests both write into it
+    return deepcopy(_parse_base_job_template(default_base_job_template_raw))
 
-    result = subprocess.run(command, capture_output=True, text=True)
 
-    if result.returncode == 0:
-        return json.loads(result.stdout)
-    else:
-        pytest.fail(f"Command failed: {result.stderr}")
+class MockACICredentials(Block):
+    _block_type_name = "Azure Container Instance Credentials"
+    service_account_info: Optional[SecretDict] = Field(
+        default=None, description="The contents of the keyfile as a dict."
+    )
 
 
-@pytest.fixture(autouse=True)
+@pytest.fixture
 async def aci_credentials_block_type_and_schema():
-    class MockACICredentials(Block):
-        _block_type_name = "Azure Container Instance Credentials"
-        service_account_info: Optional[SecretDict] = Field(
-            default=None, description="The contents of the keyfile as a dict."
-        )
-
+    # The registration must be repeated per test because the autouse `clear_db`
+    # fixture empties the database after each one; defining the block class
+    # once at module scope at least avoids rebuilding the class and its schema
+    # every time. Only the provision tests read the block type back, so the
+    # fixture is requested explicitly rather than autouse — the mock-only
+    # tests in this module never touch the database at all.
     await MockACICredentials.register_type_and_schema()
 
 
+class FakeAzureCLI:
+    """
+    Minimal stand-in for `AzureCLI`: a plain attribute holding an `AsyncMock`
+    for `run_command`, the only method the provisioner calls. Attribute access
+    on the container is an ordinary instance lookup rather than going through
+    mock dispatch, and anything other than `run_command` fails with a normal
+    `AttributeError`.
+    """
+
+    def __init__(self):
+        self.run_command = AsyncMock()
+
+
 @pytest.fixture(autouse=True)
 async def provisioner():
+    from prefect.infrastructure.provisioners.container_instance import (
+        ContainerInstancePushProvisioner,
+    )
+
     provisioner = ContainerInstancePushProvisioner()
-    provisioner.azure_cli = MagicMock()
-    provisioner.azure_cli.run_command = AsyncMock()
+    provisioner.azure_cli = FakeAzureCLI()
     yield provisioner
 
 
@@ -95,33 +382,22 @@ async def test_aci_az_installed(provisioner):
     await provisioner._verify_az_ready()
 
     expected_calls = [
-        call("az --version", ignore_if_exists=True),
-        call("az account list --output json", return_json=True),
+        call(AZ_VERSION_CMD, ignore_if_exists=True),
+        call(ACCOUNT_LIST_CMD, return_json=True),
     ]
-    provisioner.azure_cli.run_command.assert_has_calls(expected_calls)
+    assert provisioner.azure_cli.run_command.call_args_list == expected_calls
 
 
 async def test_select_subscription(provisioner):
-    subscriptions_list = [
-        {
-            "cloudName": "AzureCloud",
-            "id": "12345678-1234-1234-1234-123456789012",
-            "isDefault": True,
-            "name": "None",
-            "state": "Enabled",
-            "tenantId": "12345678-1234-1234-1234-123456789012",
-        }
-    ]
-
     provisioner.azure_cli.run_command.side_effect = [
-        subscriptions_list,
+        SUBSCRIPTIONS_LIST,
     ]
 
     await provisioner._select_subscription()
 
     expected_calls = [
         call(
-            "az account list --output json",
+            ACCOUNT_LIST_CMD,
             failure_message=(
                 "No Azure subscriptions found. Please create an Azure subscription and"
                 " try again."
@@ -130,7 +406,7 @@ async def test_select_subscription(provisioner):
             return_json=True,
         ),
     ]
-    provisioner.azure_cli.run_command.assert_has_calls(expected_calls)
+    assert provisioner.azure_cli.run_command.call_args_list == expected_calls
 
 
 async def test_set_location(provisioner):
@@ -141,9 +417,9 @@ async def test_set_location(provisioner):
     await provisioner.set_location()
 
     expected_calls = [
-        call('az account list-locations --query "[?isDefault].name" --output tsv'),
+        call(LIST_LOCATIONS_CMD),
     ]
-    provisioner.azure_cli.run_command.assert_has_calls(expected_calls)
+    assert provisioner.azure_cli.run_command.call_args_list == expected_calls
 
 
 async def test_aci_resource_group_creation_creates_new_group(provisioner):
@@ -174,7 +450,7 @@ async def test_aci_resource_group_creation_creates_new_group(provisioner):
             ignore_if_exists=True,
         ),
     ]
-    provisioner.azure_cli.run_command.assert_has_calls(expected_calls)
+    assert provisioner.azure_cli.run_command.call_args_list == expected_calls
 
 
 async def test_aci_resource_group_creation_handles_existing_group(provisioner):
@@ -188,42 +464,8 @@ async def test_aci_resource_group_creation_handles_existing_group(provisioner):
             return_json=True,
         )
     ]
-    provisioner.azure_cli.run_command.assert_has_calls(expected_calls)
-    assert provisioner.azure_cli.run_command.call_count == 1
-    assert (
-        provisioner.azure_cli.run_command.call_args[0][0].startswith("az group create")
-        is False
-    )
-
-
-async def test_aci_resource_group_creation_handles_errors(provisioner):
-    error = CalledProcessError(1, "cmd", output="output", stderr="error")
-    provisioner.azure_cli.run_command.side_effect = [None, error]
-
-    with pytest.raises(CalledProcessError):
-        await provisioner._create_resource_group()
-
-    expected_calls = [
-        call(
-            "az group exists --name prefect-aci-push-pool-rg --subscription None",
-            return_json=True,
-        ),
-        call(
-            (
-                "az group create --name 'prefect-aci-push-pool-rg' --location 'None'"
-                " --subscription 'None'"
-            ),
-            success_message=(
-                "Resource group 'prefect-aci-push-pool-rg' created successfully"
-            ),
-            failure_message=(
-                "Failed to create resource group 'prefect-aci-push-pool-rg' in"
-                " subscription 'None'"
-            ),
-            ignore_if_exists=True,
-        ),
-    ]
-    provisioner.azure_cli.run_command.assert_has_calls(expected_calls)
+    # Equality with the full history also proves no create command followed
+    assert provisioner.azure_cli.run_command.call_args_list == expected_calls
 
 
 async def test_aci_container_instance_creation_creates_new_instance(provisioner):
@@ -263,7 +505,7 @@ async def test_aci_container_instance_creation_creates_new_instance(provisioner)
             ignore_if_exists=True,
         ),
     ]
-    provisioner.azure_cli.run_command.assert_has_calls(expected_calls)
+    assert provisioner.azure_cli.run_command.call_args_list == expected_calls
 
 
 async def test_aci_container_instance_creation_handles_existing_instance(provisioner):
@@ -281,77 +523,24 @@ async def test_aci_container_instance_creation_handles_existing_instance(provisi
             return_json=True,
         ),
     ]
-    provisioner.azure_cli.run_command.assert_has_calls(expected_calls)
-
-    assert provisioner.azure_cli.run_command.call_count == 1
-    assert (
-        provisioner.azure_cli.run_command.call_args[0][0].startswith(
-            "az container create"
-        )
-        is False
-    )
+    # Equality with the full history also proves no create command followed
+    assert provisioner.azure_cli.run_command.call_args_list == expected_calls
 
 
-async def test_aci_container_instance_creation_handles_errors(provisioner):
-    error = CalledProcessError(1, "cmd", output="output", stderr="error")
-    provisioner.azure_cli.run_command.side_effect = [None, error]
+async def test_aci_app_registration_creates_new_app(provisioner):
+    provisioner.azure_cli.run_command.side_effect = [
+        None,  # App does not exist
+        APP_REGISTRATION,  # Successful creation
+    ]
 
-    with pytest.raises(CalledProcessError):
-        await provisioner._create_container_instance()
+    await provisioner._create_app_registration()
 
     expected_calls = [
+        call(APP_LIST_CMD),
         call(
-            (
-                "az container list --resource-group prefect-aci-push-pool-rg"
-                " --subscription None --query"
-                " \"[?name=='prefect-aci-push-pool-container']\" --output json"
-            ),
-            return_json=True,
-        ),
-        call(
-            (
-                "az container create --name prefect-aci-push-pool-container"
-                " --resource-group prefect-aci-push-pool-rg --image"
-                " docker.io/prefecthq/prefect:2-latest --location None --subscription"
-                " None --restart-policy OnFailure --output json"
-            ),
+            "az ad app create --display-name prefect-aci-push-pool-app --output json",
             success_message=(
-                "Container instance 'prefect-aci-push-pool-container' created"
-                " successfully in resource group 'prefect-aci-push-pool-rg' in location"
-                " 'None' in subscription 'None'"
-            ),
-            failure_message=(
-                "Failed to create container instance 'prefect-aci-push-pool-container'"
-                " in resource group 'prefect-aci-push-pool-rg' in location 'None' in"
-                " subscription 'None'"
-            ),
-            ignore_if_exists=True,
-        ),
-    ]
-    provisioner.azure_cli.run_command.assert_has_calls(expected_calls)
-
-
-async def test_aci_app_registration_creates_new_app(provisioner):
-    app_registration = {
-        "appId": "12345678-1234-1234-1234-123456789012",
-        "displayName": "prefect-aci-push-pool-app",
-        "identifierUris": ["https://prefect-aci-push-pool-app"],
-    }
-    provisioner.azure_cli.run_command.side_effect = [
-        None,  # App does not exist
-        app_registration,  # Successful creation
-    ]
-
-    await provisioner._create_app_registration()
-
-    expected_calls = [
-        call(
-            "az ad app list --display-name prefect-aci-push-pool-app --output json",
-        ),
-        call(
-            "az ad app create --display-name prefect-aci-push-pool-app --output json",
-            success_message=(
-                "App registration 'prefect-aci-push-pool-app' created successfully"
+                "App registration 'prefect-aci-push-pool-app' created successfully"
             ),
             failure_message=(
                 "Failed to create app registration with name"
@@ -360,275 +549,102 @@ async def test_aci_app_registration_creates_new_app(provisioner):
             ignore_if_exists=True,
         ),
     ]
-    provisioner.azure_cli.run_command.assert_has_calls(expected_calls)
+    assert provisioner.azure_cli.run_command.call_args_list == expected_calls
 
 
 async def test_aci_app_registration_handles_existing_app(provisioner):
-    app_registration = [
-        {
-            "appId": "12345678-1234-1234-1234-123456789012",
-            "displayName": "prefect-aci-push-pool-app",
-            "identifierUris": ["https://prefect-aci-push-pool-app"],
-        }
-    ]
-    provisioner.azure_cli.run_command.return_value = app_registration
+    provisioner.azure_cli.run_command.return_value = [APP_REGISTRATION]
 
     await provisioner._create_app_registration()
 
     expected_calls = [
-        call(
-            "az ad app list --display-name prefect-aci-push-pool-app --output json",
-        ),
-    ]
-    provisioner.azure_cli.run_command.assert_has_calls(expected_calls)
-
-    assert provisioner.azure_cli.run_command.call_count == 1
-    assert (
-        provisioner.azure_cli.run_command.call_args[0][0].startswith("az ad app create")
-        is False
-    )
-
-
-async def test_aci_app_registration_handles_errors(provisioner):
-    error = CalledProcessError(1, "cmd", output="output", stderr="error")
-    provisioner.azure_cli.run_command.side_effect = [None, error]
-
-    with pytest.raises(CalledProcessError):
-        await provisioner._create_app_registration()
-
-    expected_calls = [
-        call(
-            "az ad app list --display-name prefect-aci-push-pool-app --output json",
-        ),
-        call(
-            "az ad app create --display-name prefect-aci-push-pool-app --output json",
-            success_message=(
-                "App registration 'prefect-aci-push-pool-app' created successfully"
-            ),
-            failure_message=(
-                "Failed to create app registration with name"
-                " 'prefect-aci-push-pool-app'"
-            ),
-            ignore_if_exists=True,
-        ),
+        call(APP_LIST_CMD),
     ]
-    provisioner.azure_cli.run_command.assert_has_calls(expected_calls)
+    # Equality with the full history also proves no create command followed
+    assert provisioner.azure_cli.run_command.call_args_list == expected_calls
 
 
 async def test_aci_service_principal_creation_creates_new_principal(provisioner):
-    service_principal = [
-        {
-            "accountEnabled": True,
-            "addIns": [],
-            "alternativeNames": [],
-            "appDescription": None,
-            "appDisplayName": "prefect-aci-push-pool-app",
-            "appId": "bcbeb824-fc3a-41f7-afc0-fc00297c1355",
-        }
-    ]
-
     provisioner.azure_cli.run_command.side_effect = [
         [],  # Principal does not exist
-        service_principal,  # Successful creation
+        SERVICE_PRINCIPAL,  # Successful creation
         ["12345678-1234-1234-1234-123456789012"],  # Principal object ID
     ]
 
-    await provisioner._get_or_create_service_principal_object_id(
-        app_id="bcbeb824-fc3a-41f7-afc0-fc00297c1355"
-    )
-    expected_calls = [
-        call(
-            (
-                "az ad sp list --all --query"
-                " \"[?appId=='bcbeb824-fc3a-41f7-afc0-fc00297c1355']\" --output json"
-            ),
-            return_json=True,
-        ),
-        call(
-            "az ad sp create --id bcbeb824-fc3a-41f7-afc0-fc00297c1355",
-            success_message=(
-                "Service principal created for app ID"
-                " 'bcbeb824-fc3a-41f7-afc0-fc00297c1355'"
-            ),
-            failure_message=(
-                "Failed to create service principal for app ID"
-                " 'bcbeb824-fc3a-41f7-afc0-fc00297c1355'"
-            ),
-        ),
-    ]
-    provisioner.azure_cli.run_command.assert_has_calls(expected_calls)
+    await provisioner._get_or_create_service_principal_object_id(app_id=APP_ID)
+    expected_calls = list(_service_principal_calls(APP_ID))
+    assert provisioner.azure_cli.run_command.call_args_list == expected_calls
 
 
 async def test_aci_service_principal_creation_handles_existing_principal(provisioner):
-    service_principal = [
-        {
-            "accountEnabled": True,
-            "addIns": [],
-            "alternativeNames": [],
-            "appDescription": None,
-            "appDisplayName": "prefect-aci-push-pool-app",
-            "appId": "bcbeb824-fc3a-41f7-afc0-fc00297c1355",
-        }
-    ]
-    provisioner.azure_cli.run_command.return_value = service_principal
-
-    await provisioner._get_or_create_service_principal_object_id(
-        app_id="bcbeb824-fc3a-41f7-afc0-fc00297c1355"
-    )
-
-    expected_calls = [
-        call(
-            (
-                "az ad sp list --all --query"
-                " \"[?appId=='bcbeb824-fc3a-41f7-afc0-fc00297c1355']\" --output json"
-            ),
-            return_json=True,
-        ),
-    ]
-    provisioner.azure_cli.run_command.assert_has_calls(expected_calls)
-
-    assert provisioner.azure_cli.run_command.call_count == 1
-    assert (
-        provisioner.azure_cli.run_command.call_args[0][0].startswith("az ad sp create")
-        is False
-    )
+    provisioner.azure_cli.run_command.return_value = SERVICE_PRINCIPAL
 
-
-async def test_aci_service_principal_creation_handles_errors(provisioner):
-    error = CalledProcessError(1, "cmd", output="output", stderr="error")
-    provisioner.azure_cli.run_command.side_effect = [[], error]
-
-    with pytest.raises(CalledProcessError):
-        await provisioner._get_or_create_service_principal_object_id(
-            app_id="bcbeb824-fc3a-41f7-afc0-fc00297c1355"
-        )
+    await provisioner._get_or_create_service_principal_object_id(app_id=APP_ID)
 
     expected_calls = [
-        call(
-            (
-                "az ad sp list --all --query"
-                " \"[?appId=='bcbeb824-fc3a-41f7-afc0-fc00297c1355']\" --output json"
-            ),
-            return_json=True,
-        ),
-        call(
-            "az ad sp create --id bcbeb824-fc3a-41f7-afc0-fc00297c1355",
-            success_message=(
-                "Service principal created for app ID"
-                " 'bcbeb824-fc3a-41f7-afc0-fc00297c1355'"
-            ),
-            failure_message=(
-                "Failed to create service principal for app ID"
-                " 'bcbeb824-fc3a-41f7-afc0-fc00297c1355'"
-            ),
-        ),
+        _service_principal_calls(APP_ID)[0],
     ]
-    provisioner.azure_cli.run_command.assert_has_calls(expected_calls)
+    # Equality with the full history also proves no create command followed
+    assert provisioner.azure_cli.run_command.call_args_list == expected_calls
 
 
 async def test_aci_assign_contributor_role(provisioner):
-    service_principal = [
-        {
-            "accountEnabled": True,
-            "addIns": [],
-            "alternativeNames": [],
-            "appDescription": None,
-            "appDisplayName": "prefect-aci-push-pool-app",
-            "appId": "bcbeb824-fc3a-41f7-afc0-fc00297c1355",
-        }
-    ]
-
     provisioner.azure_cli.run_command.side_effect = [
         [],  # Principal does not exist
-        service_principal,  # Successful creation
+        SERVICE_PRINCIPAL,  # Successful creation
         [{"id": "12345678-1234-1234-1234-123456789012"}],  # Principal object ID
         [{"roleDefinitionName": None, "scope": None}],  # Successful creation
         None,
     ]
 
-    await provisioner._assign_contributor_role(
-        app_id="bcbeb824-fc3a-41f7-afc0-fc00297c1355"
-    )
+    await provisioner._assign_contributor_role(app_id=APP_ID)
 
     expected_calls = [
+        *_service_principal_calls(APP_ID),
         call(
             (
-                "az ad sp list --all --query"
-                " \"[?appId=='bcbeb824-fc3a-41f7-afc0-fc00297c1355']\" --output json"
+                "az role assignment list --assignee"
+                " 12345678-1234-1234-1234-123456789012 --role Contributor --scope"
+                " /subscriptions/None/resourceGroups/prefect-aci-push-pool-rg --output"
+                " json"
             ),
             return_json=True,
         ),
         call(
-            "az ad sp create --id bcbeb824-fc3a-41f7-afc0-fc00297c1355",
+            (
+                "az role assignment create --role Contributor --assignee-object-id"
+                " 12345678-1234-1234-1234-123456789012 --scope"
+                " /subscriptions/None/resourceGroups/prefect-aci-push-pool-rg"
+            ),
             success_message=(
-                "Service principal created for app ID"
-                " 'bcbeb824-fc3a-41f7-afc0-fc00297c1355'"
+                "Contributor role assigned to service principal with object ID"
+                " '12345678-1234-1234-1234-123456789012'"
             ),
             failure_message=(
-                "Failed to create service principal for app ID"
-                " 'bcbeb824-fc3a-41f7-afc0-fc00297c1355'"
+                "Failed to assign Contributor role to service principal with object ID"
+                " '12345678-1234-1234-1234-123456789012'"
             ),
+            ignore_if_exists=True,
         ),
     ]
-    provisioner.azure_cli.run_command.assert_has_calls(expected_calls)
+    assert provisioner.azure_cli.run_command.call_args_list == expected_calls
 
 
 async def test_aci_assign_contributor_role_handles_existing_role(provisioner):
-    service_principal = [
-        {
-            "accountEnabled": True,
-            "addIns": [],
-            "alternativeNames": [],
-            "appDescription": None,
-            "appDisplayName": "prefect-aci-push-pool-app",
-            "appId": "bcbeb824-fc3a-41f7-afc0-fc00297c1355",
-        }
-    ]
-
     role = "Contributor"
     scope = "/subscriptions/None/resourceGroups/prefect-aci-push-pool-rg"
 
     provisioner.azure_cli.run_command.side_effect = [
         [],  # Principal does not exist
-        service_principal,  # Successful creation
+        SERVICE_PRINCIPAL,  # Successful creation
         [{"id": "12345678-1234-1234-1234-123456789012"}],  # Principal object ID
         [{"roleDefinitionName": role, "scope": scope}],  # Successful creation
     ]
 
-    await provisioner._assign_contributor_role(
-        app_id="bcbeb824-fc3a-41f7-afc0-fc00297c1355"
-    )
+    await provisioner._assign_contributor_role(app_id=APP_ID)
 
     expected_calls = [
-        call(
-            (
-                "az ad sp list --all --query"
-                " \"[?appId=='bcbeb824-fc3a-41f7-afc0-fc00297c1355']\" --output json"
-            ),
-            return_json=True,
-        ),
-        call(
-            "az ad sp create --id bcbeb824-fc3a-41f7-afc0-fc00297c1355",
-            success_message=(
-                "Service principal created for app ID"
-                " 'bcbeb824-fc3a-41f7-afc0-fc00297c1355'"
-            ),
-            failure_message=(
-                "Failed to create service principal for app ID"
-                " 'bcbeb824-fc3a-41f7-afc0-fc00297c1355'"
-            ),
-        ),
-        call(
-            (
-                "az ad sp list --all --query"
-                " \"[?appId=='bcbeb824-fc3a-41f7-afc0-fc00297c1355']\" --output json"
-            ),
-            failure_message=(
-                "Failed to retrieve new service principal for app ID"
-                " bcbeb824-fc3a-41f7-afc0-fc00297c1355"
-            ),
-            return_json=True,
-        ),
+        *_service_principal_calls(APP_ID),
         call(
             (
                 "az role assignment list --assignee"
@@ -639,66 +655,146 @@ async def test_aci_assign_contributor_role_handles_existing_role(provisioner):
             return_json=True,
         ),
     ]
-    provisioner.azure_cli.run_command.assert_has_calls(expected_calls)
-
-
-async def test_aci_assign_contributor_role_handles_error(provisioner):
-    service_principal = [
-        {
-            "accountEnabled": True,
-            "addIns": [],
-            "alternativeNames": [],
-            "appDescription": None,
-            "appDisplayName": "prefect-aci-push-pool-app",
-            "appId": "bcbeb824-fc3a-41f7-afc0-fc00297c1355",
-        }
-    ]
-
+    assert provisioner.azure_cli.run_command.call_args_list == expected_calls
+
+
+# Table of (method, kwargs, results before the error, expected calls) driving
+# `test_aci_command_errors_propagate`; each row previously had a hand-rolled
+# test of the same shape.
+ERROR_PROPAGATION_CASES = [
+    pytest.param(
+        "_create_resource_group",
+        {},
+        [None],
+        [
+            call(
+                "az group exists --name prefect-aci-push-pool-rg --subscription None",
+                return_json=True,
+            ),
+            call(
+                (
+                    "az group create --name 'prefect-aci-push-pool-rg' --location"
+                    " 'None' --subscription 'None'"
+                ),
+                success_message=(
+                    "Resource group 'prefect-aci-push-pool-rg' created successfully"
+                ),
+                failure_message=(
+                    "Failed to create resource group 'prefect-aci-push-pool-rg' in"
+                    " subscription 'None'"
+                ),
+                ignore_if_exists=True,
+            ),
+        ],
+        id="resource-group",
+    ),
+    pytest.param(
+        "_create_container_instance",
+        {},
+        [None],
+        [
+            call(
+                (
+                    "az container list --resource-group prefect-aci-push-pool-rg"
+                    " --subscription None --query"
+                    " \"[?name=='prefect-aci-push-pool-container']\" --output json"
+                ),
+                return_json=True,
+            ),
+            call(
+                (
+                    "az container create --name prefect-aci-push-pool-container"
+                    " --resource-group prefect-aci-push-pool-rg --image"
+                    " docker.io/prefecthq/prefect:2-latest --location None"
+                    " --subscription None --restart-policy OnFailure --output json"
+                ),
+                success_message=(
+                    "Container instance 'prefect-aci-push-pool-container' created"
+                    " successfully in resource group 'prefect-aci-push-pool-rg' in"
+                    " location 'None' in subscription 'None'"
+                ),
+                failure_message=(
+                    "Failed to create container instance"
+                    " 'prefect-aci-push-pool-container' in resource group"
+                    " 'prefect-aci-push-pool-rg' in location 'None' in subscription"
+                    " 'None'"
+                ),
+                ignore_if_exists=True,
+            ),
+        ],
+        id="container-instance",
+    ),
+    pytest.param(
+        "_create_app_registration",
+        {},
+        [None],
+        [
+            call(APP_LIST_CMD),
+            call(
+                (
+                    "az ad app create --display-name prefect-aci-push-pool-app"
+                    " --output json"
+                ),
+                success_message=(
+                    "App registration 'prefect-aci-push-pool-app' created successfully"
+                ),
+                failure_message=(
+                    "Failed to create app registration with name"
+                    " 'prefect-aci-push-pool-app'"
+                ),
+                ignore_if_exists=True,
+            ),
+        ],
+        id="app-registration",
+    ),
+    pytest.param(
+        "_get_or_create_service_principal_object_id",
+        {"app_id": APP_ID},
+        [[]],
+        list(_service_principal_calls(APP_ID)[:2]),
+        id="service-principal",
+    ),
+    pytest.param(
+        "_assign_contributor_role",
+        {"app_id": APP_ID},
+        [
+            [],  # Principal does not exist
+            SERVICE_PRINCIPAL,  # Successful creation
+            [{"id": "12345678-1234-1234-1234-123456789012"}],  # Principal object ID
+        ],
+        [
+            *_service_principal_calls(APP_ID),
+            # The role-assignment check is the call that raises
+            call(
+                (
+                    "az role assignment list --assignee"
+                    " 12345678-1234-1234-1234-123456789012 --role Contributor --scope"
+                    " /subscriptions/None/resourceGroups/prefect-aci-push-pool-rg"
+                    " --output json"
+                ),
+                return_json=True,
+            ),
+        ],
+        id="contributor-role",
+    ),
+]
+
+
+@pytest.mark.parametrize(
+    "method, kwargs, results, expected_calls", ERROR_PROPAGATION_CASES
+)
+async def test_aci_command_errors_propagate(
+    provisioner, method, kwargs, results, expected_calls
+):
     error = CalledProcessError(1, "cmd", output="output", stderr="error")
-    provisioner.azure_cli.run_command.side_effect = [
-        [],  # Principal does not exist
-        service_principal,  # Successful creation
-        [{"id": "12345678-1234-1234-1234-123456789012"}],  # Principal object ID
-        error,
-    ]
+    provisioner.azure_cli.run_command.side_effect = [*results, error]
 
     with pytest.raises(CalledProcessError):
-        await provisioner._assign_contributor_role(
-            app_id="bcbeb824-fc3a-41f7-afc0-fc00297c1355"
-        )
+        await getattr(provisioner, method)(**kwargs)
 
-    expected_calls = [
-        call(
-            (
-                "az ad sp list --all --query"
-                " \"[?appId=='bcbeb824-fc3a-41f7-afc0-fc00297c1355']\" --output json"
-            ),
-            return_json=True,
-        ),
-        call(
-            "az ad sp create --id bcbeb824-fc3a-41f7-afc0-fc00297c1355",
-            success_message=(
-                "Service principal created for app ID"
-                " 'bcbeb824-fc3a-41f7-afc0-fc00297c1355'"
-            ),
-            failure_message=(
-                "Failed to create service principal for app ID"
-                " 'bcbeb824-fc3a-41f7-afc0-fc00297c1355'"
-            ),
-        ),
-        call(
-            (
-                "az ad sp list --all --query"
-                " \"[?appId=='bcbeb824-fc3a-41f7-afc0-fc00297c1355']\" --output json"
-            ),
-            failure_message=(
-                "Failed to retrieve new service principal for app ID"
-                " bcbeb824-fc3a-41f7-afc0-fc00297c1355"
-            ),
-            return_json=True,
-        ),
-    ]
-    provisioner.azure_cli.run_command.assert_has_calls(expected_calls)
+    # The failing command is recorded before the error propagates, so the
+    # expected list is the complete call history for every case
+    assert provisioner.azure_cli.run_command.call_args_list == expected_calls
 
 
 async def test_aci_provision_az_not_installed(provisioner):
@@ -713,506 +809,122 @@ async def test_aci_provision_az_not_installed(provisioner):
         )
 
     expected_calls = [
-        call("az --version", ignore_if_exists=True),
+        call(AZ_VERSION_CMD, ignore_if_exists=True),
     ]
-    provisioner.azure_cli.run_command.assert_has_calls(expected_calls)
+    assert provisioner.azure_cli.run_command.call_args_list == expected_calls
 
 
-async def test_aci_provision_no_existing_credentials_block(
+@pytest.mark.parametrize(
+    "credentials_block_exists",
+    [False, True],
+    ids=["new-credentials", "existing-credentials"],
+)
+async def test_aci_provision(
+    aci_credentials_block_type_and_schema,
     default_base_job_template,
-    prefect_client: PrefectClient,
-    provisioner: ContainerInstancePushProvisioner,
+    prefect_client: "PrefectClient",
+    provisioner: "ContainerInstancePushProvisioner",
+    credentials_block_exists,
 ):
-    subscription_list = [
-        {
-            "cloudName": "AzureCloud",
-            "id": "12345678-1234-1234-1234-123456789012",
-            "isDefault": True,
-            "name": "subscription_1",
-            "state": "Enabled",
-            "tenantId": "12345678-1234-1234-1234-123456789012",
-        }
-    ]
-
-    app_registration = {
-        "appId": "12345678-1234-1234-1234-123456789012",
-        "displayName": "prefect-aci-push-pool-app",
-        "identifierUris": ["https://prefect-aci-push-pool-app"],
-    }
-
-    client_secret = {
-        "appId": "5407b48a-a28d-49ea-a740-54504847153f",
-        "password": "<MY_SECRET>",
-        "tenant": "9ee4947a-f114-4939-a5ac-7f0ed786de36",
-    }
-
-    new_service_principal = [
-        {
-            "id": "abf1b3a0-1b1b-4c1c-9c9c-1c1c1c1c1c1c",
-            "accountEnabled": True,
-            "addIns": [],
-            "alternativeNames": [],
-            "appDescription": None,
-            "appDisplayName": "prefect-aci-push-pool-app",
-            "appId": "bcbeb824-fc3a-41f7-afc0-fc00297c1355",
-        }
-    ]
-
-    role_assignments = {
-        "roleDefinitionName": "Contributor",
-    }
+    from prefect.client.schemas.actions import BlockDocumentCreate
+
+    # The existing-credentials variant creates its block inline rather than
+    # through a fixture; an async fixture cannot be pulled in lazily with
+    # `request.getfixturevalue` from inside a running async test
+    existing_block_id = None
+    if credentials_block_exists:
+        block_type = await prefect_client.read_block_type_by_slug(
+            slug="azure-container-instance-credentials"
+        )
+        block_schema = await prefect_client.get_most_recent_block_schema_for_block_type(
+            block_type_id=block_type.id
+        )
+        assert block_schema is not None
+
+        block_document = await prefect_client.create_block_document(
+            block_document=BlockDocumentCreate(
+                name="test-work-pool-push-pool-credentials",
+                data={
+                    "client_id": "12345678-1234-1234-1234-123456789012",
+                    "tenant_id": "9ee4947a-f114-4939-a5ac-7f0ed786de36",
+                    "client_secret": "<MY_SECRET>",
+                },
+                block_type_id=block_type.id,
+                block_schema_id=block_schema.id,
+            )
+        )
+        existing_block_id = block_document.id
 
-    provisioner.azure_cli.run_command.side_effect = [
+    results = [
         "2.0.0",  # Azure CLI is installed
-        subscription_list,  #  Azure login check
-        subscription_list,  # Select subscription
+        PROVISION_SUBSCRIPTIONS_LIST,  #  Azure login check
+        PROVISION_SUBSCRIPTIONS_LIST,  # Select subscription
         "westus",  # Set location
         None,  # Resource group does not exist
         "New resource group created",  # Successful creation
         None,  # App does not exist
-        app_registration,  # Successful creation
-        client_secret,  # Generate app secret
+        APP_REGISTRATION,  # Successful creation
+    ]
+    if not credentials_block_exists:
+        results.append(CLIENT_SECRET)  # Generate app secret
+    results += [
         [],  # Principal does not exist
         None,  # Successful creation
-        new_service_principal,  # Successful retrieval
+        NEW_SERVICE_PRINCIPAL,  # Successful retrieval
         [],  # Role does not exist
-        role_assignments,  # Successful creation
+        ROLE_ASSIGNMENT,  # Successful creation
         [],  # Container instance does not exist
         None,  # Successful creation
     ]
 
+    # No secret is generated when an existing credentials block is reused
+    expected_calls = list(
+        _expected_provision_calls(
+            include_secret_generation=not credentials_block_exists
+        )
+    )
+
+    # Dispatch results by command instead of a single positional side_effect
+    # list: each command pops from its own queue, so a missing or unexpected
+    # command fails immediately with the command string rather than feeding
+    # the wrong result into the rest of the flow
+    responses = {}
+    for expected, result in zip(expected_calls, results):
+        responses.setdefault(expected.args[0], deque()).append(result)
+
+    provisioner.azure_cli.run_command.side_effect = (
+        lambda command, *args, **kwargs: responses[command].popleft()
+    )
+
+    provision_kwargs = {"client": prefect_client} if credentials_block_exists else {}
     new_base_job_template = await provisioner.provision(
         work_pool_name="test-work-pool",
         base_job_template=default_base_job_template,
+        **provision_kwargs,
     )
 
     assert new_base_job_template
 
-    expected_calls = [
-        # _verify_az_ready
-        call("az --version", ignore_if_exists=True),
-        call("az account list --output json", return_json=True),
-        # _select_subscription
-        call(
-            "az account list --output json",
-            failure_message=(
-                "No Azure subscriptions found. Please create an Azure subscription and"
-                " try again."
-            ),
-            ignore_if_exists=True,
-            return_json=True,
-        ),
-        # _set_location
-        call('az account list-locations --query "[?isDefault].name" --output tsv'),
-        # _create_resource_group
-        call(
-            (
-                "az group exists --name prefect-aci-push-pool-rg --subscription"
-                " 12345678-1234-1234-1234-123456789012"
-            ),
-            return_json=True,
-        ),
-        call(
-            (
-                "az group create --name 'prefect-aci-push-pool-rg' --location 'westus'"
-                " --subscription '12345678-1234-1234-1234-123456789012'"
-            ),
-            success_message=(
-                "Resource group 'prefect-aci-push-pool-rg' created successfully"
-            ),
-            failure_message=(
-                "Failed to create resource group 'prefect-aci-push-pool-rg' in"
-                " subscription 'subscription_1'"
-            ),
-            ignore_if_exists=True,
-        ),
-        # _create_app_registration
-        call("az ad app list --display-name prefect-aci-push-pool-app --output json"),
-        call(
-            "az ad app create --display-name prefect-aci-push-pool-app --output json",
-            success_message=(
-                "App registration 'prefect-aci-push-pool-app' created successfully"
-            ),
-            failure_message=(
-                "Failed to create app registration with name"
-                " 'prefect-aci-push-pool-app'"
-            ),
-            ignore_if_exists=True,
-        ),
-        # _create secret
-        call(
-            (
-                "az ad app credential reset --id 12345678-1234-1234-1234-123456789012"
-                " --append --output json"
-            ),
-            success_message=(
-                "Secret generated for app registration with client ID"
-                " '12345678-1234-1234-1234-123456789012'"
-            ),
-            failure_message=(
-                "Failed to generate secret for app registration with client ID"
-                " '12345678-1234-1234-1234-123456789012'. If you have already generated"
-                " 2 secrets for this app registration, please delete one from the"
-                " `prefect-aci-push-pool-app` resource and try again."
-            ),
-            ignore_if_exists=True,
-            return_json=True,
-        ),
-        # _create_service_principal
-        call(
-            (
-                "az ad sp list --all --query"
-                " \"[?appId=='12345678-1234-1234-1234-123456789012']\" --output json"
-            ),
-            return_json=True,
-        ),
-        call(
-            "az ad sp create --id 12345678-1234-1234-1234-123456789012",
-            success_message=(
-                "Service principal created for app ID"
-                " '12345678-1234-1234-1234-123456789012'"
-            ),
-            failure_message=(
-                "Failed to create service principal for app ID"
-                " '12345678-1234-1234-1234-123456789012'"
-            ),
-        ),
-        call(
-            (
-                "az ad sp list --all --query"
-                " \"[?appId=='12345678-1234-1234-1234-123456789012']\" --output json"
-            ),
-            failure_message=(
-                "Failed to retrieve new service principal for app ID"
-                " 12345678-1234-1234-1234-123456789012"
-            ),
-            return_json=True,
-        ),
-        # _assign_contributor_role
-        call(
-            (
-                "az role assignment list --assignee"
-                " abf1b3a0-1b1b-4c1c-9c9c-1c1c1c1c1c1c --role Contributor --scope"
-                " /subscriptions/12345678-1234-1234-1234-123456789012/resourceGroups/prefect-aci-push-pool-rg"
-                " --output json"
-            ),
-            return_json=True,
-        ),
-        call(
-            (
-                "az role assignment create --role Contributor --assignee-object-id"
-                " abf1b3a0-1b1b-4c1c-9c9c-1c1c1c1c1c1c --scope"
-                " /subscriptions/12345678-1234-1234-1234-123456789012/resourceGroups/prefect-aci-push-pool-rg"
-            ),
-            success_message=(
-                "Contributor role assigned to service principal with object ID"
-                " 'abf1b3a0-1b1b-4c1c-9c9c-1c1c1c1c1c1c'"
-            ),
-            failure_message=(
-                "Failed to assign Contributor role to service principal with object ID"
-                " 'abf1b3a0-1b1b-4c1c-9c9c-1c1c1c1c1c1c'"
-            ),
-            ignore_if_exists=True,
-        ),
-        # _create_container_instance
-        call(
-            (
-                "az container list --resource-group prefect-aci-push-pool-rg"
-                " --subscription 12345678-1234-1234-1234-123456789012 --query"
-                " \"[?name=='prefect-aci-push-pool-container']\" --output json"
-            ),
-            return_json=True,
-        ),
-        call(
-            (
-                "az container create --name prefect-aci-push-pool-container"
-                " --resource-group prefect-aci-push-pool-rg --image"
-                " docker.io/prefecthq/prefect:2-latest --location westus --subscription"
-                " 12345678-1234-1234-1234-123456789012 --restart-policy OnFailure"
-                " --output json"
-            ),
-            success_message=(
-                "Container instance 'prefect-aci-push-pool-container' created"
-                " successfully in resource group 'prefect-aci-push-pool-rg' in location"
-                " 'westus' in subscription 'subscription_1'"
-            ),
-            failure_message=(
-                "Failed to create container instance 'prefect-aci-push-pool-container'"
-                " in resource group 'prefect-aci-push-pool-rg' in location 'westus' in"
-                " subscription 'subscription_1'"
-            ),
-            ignore_if_exists=True,
-        ),
-    ]
-
-    provisioner.azure_cli.run_command.assert_has_calls(expected_calls)
+    # The expected list is the complete call history, so compare it directly;
+    # exact equality also proves the credential reset command was never issued
+    # in the existing-credentials case
+    assert provisioner.azure_cli.run_command.call_args_list == expected_calls
 
     new_block_doc_id = new_base_job_template["variables"]["properties"][
         "aci_credentials"
     ]["default"]["$ref"]["block_document_id"]
-    assert new_block_doc_id
-
-    block_doc = await prefect_client.read_block_document(new_block_doc_id)
-
-    assert block_doc.name == "test-work-pool-push-pool-credentials"
-    assert block_doc.data == {
-        "client_id": "12345678-1234-1234-1234-123456789012",
-        "tenant_id": "9ee4947a-f114-4939-a5ac-7f0ed786de36",
-        "client_secret": "<MY_SECRET>",
-    }
 
-    new_base_job_template["variables"]["properties"]["subscription_id"][
-        "default"
-    ] = "12345678-1234-1234-1234-123456789012"
-
-    new_base_job_template["variables"]["properties"]["resource_group_name"][
-        "default"
-    ] = "prefect-aci-push-pool-rg"
-
-
-async def test_aci_provision_existing_credentials_block(
-    default_base_job_template,
-    prefect_client: PrefectClient,
-    existing_credentials_block,
-    provisioner: ContainerInstancePushProvisioner,
-):
-    subscription_list = [
-        {
-            "cloudName": "AzureCloud",
-            "id": "12345678-1234-1234-1234-123456789012",
-            "isDefault": True,
-            "name": "subscription_1",
-            "state": "Enabled",
-            "tenantId": "12345678-1234-1234-1234-123456789012",
-        }
-    ]
+    if credentials_block_exists:
+        # Verify that the existing credentials block was reused
+        assert new_block_doc_id == str(existing_block_id)
+    else:
+        assert new_block_doc_id
 
-    app_registration = {
-        "appId": "12345678-1234-1234-1234-123456789012",
-        "displayName": "prefect-aci-push-pool-app",
-        "identifierUris": ["https://prefect-aci-push-pool-app"],
-    }
+        block_doc = await prefect_client.read_block_document(new_block_doc_id)
 
-    new_service_principal = [
-        {
-            "id": "abf1b3a0-1b1b-4c1c-9c9c-1c1c1c1c1c1c",
-            "accountEnabled": True,
-            "addIns": [],
-            "alternativeNames": [],
-            "appDescription": None,
-            "appDisplayName": "prefect-aci-push-pool-app",
-            "appId": "bcbeb824-fc3a-41f7-afc0-fc00297c1355",
+        assert block_doc.name == "test-work-pool-push-pool-credentials"
+        assert block_doc.data == {
+            "client_id": "12345678-1234-1234-1234-123456789012",
+            "tenant_id": "9ee4947a-f114-4939-a5ac-7f0ed786de36",
+            "client_secret": "<MY_SECRET>",
         }
-    ]
-
-    role_assignments = {
-        "roleDefinitionName": "Contributor",
-    }
-
-    provisioner.azure_cli.run_command.side_effect = [
-        "2.0.0",  # Azure CLI is installed
-        subscription_list,  # Login check
-        subscription_list,  # Select subscription
-        "westus",  # Set location
-        None,  # Resource group does not exist
-        "New resource group created",  # Successful creation
-        None,  # App does not exist
-        app_registration,  # Successful creation
-        [],  # Principal does not exist
-        None,  # Successful creation
-        new_service_principal,  # Successful retrieval
-        [],  # Role does not exist
-        role_assignments,  # Successful creation
-        [],  # Container instance does not exist
-        None,  # Successful creation
-    ]
-
-    new_base_job_template = await provisioner.provision(
-        work_pool_name="test-work-pool",
-        base_job_template=default_base_job_template,
-        client=prefect_client,
-    )
-
-    assert new_base_job_template
-
-    # Verify that the existing credentials block was reused
-    new_block_doc_id = new_base_job_template["variables"]["properties"][
-        "aci_credentials"
-    ]["default"]["$ref"]["block_document_id"]
-    assert new_block_doc_id == str(existing_credentials_block)
-
-    # Verify Azure CLI interactions as in the previous test if applicable
-    expected_calls = [
-        # _verify_az_ready
-        call("az --version", ignore_if_exists=True),
-        call("az account list --output json", return_json=True),
-        # _select_subscription
-        call(
-            "az account list --output json",
-            failure_message=(
-                "No Azure subscriptions found. Please create an Azure subscription and"
-                " try again."
-            ),
-            ignore_if_exists=True,
-            return_json=True,
-        ),
-        # _set_location
-        call('az account list-locations --query "[?isDefault].name" --output tsv'),
-        # _create_resource_group
-        call(
-            (
-                "az group exists --name prefect-aci-push-pool-rg --subscription"
-                " 12345678-1234-1234-1234-123456789012"
-            ),
-            return_json=True,
-        ),
-        call(
-            (
-                "az group create --name 'prefect-aci-push-pool-rg' --location 'westus'"
-                " --subscription '12345678-1234-1234-1234-123456789012'"
-            ),
-            success_message=(
-                "Resource group 'prefect-aci-push-pool-rg' created successfully"
-            ),
-            failure_message=(
-                "Failed to create resource group 'prefect-aci-push-pool-rg' in"
-                " subscription 'subscription_1'"
-            ),
-            ignore_if_exists=True,
-        ),
-        # _create_app_registration
-        call("az ad app list --display-name prefect-aci-push-pool-app --output json"),
-        call(
-            "az ad app create --display-name prefect-aci-push-pool-app --output json",
-            success_message=(
-                "App registration 'prefect-aci-push-pool-app' created successfully"
-            ),
-            failure_message=(
-                "Failed to create app registration with name"
-                " 'prefect-aci-push-pool-app'"
-            ),
-            ignore_if_exists=True,
-        ),
-        # _create_service_principal
-        call(
-            (
-                "az ad sp list --all --query"
-                " \"[?appId=='12345678-1234-1234-1234-123456789012']\" --output json"
-            ),
-            return_json=True,
-        ),
-        call(
-            "az ad sp create --id 12345678-1234-1234-1234-123456789012",
-            success_message=(
-                "Service principal created for app ID"
-                " '12345678-1234-1234-1234-123456789012'"
-            ),
-            failure_message=(
-                "Failed to create service principal for app ID"
-                " '12345678-1234-1234-1234-123456789012'"
-            ),
-        ),
-        call(
-            (
-                "az ad sp list --all --query"
-                " \"[?appId=='12345678-1234-1234-1234-123456789012']\" --output json"
-            ),
-            failure_message=(
-                "Failed to retrieve new service principal for app ID"
-                " 12345678-1234-1234-1234-123456789012"
-            ),
-            return_json=True,
-        ),
-        # _assign_contributor_role
-        call(
-            (
-                "az role assignment list --assignee"
-                " abf1b3a0-1b1b-4c1c-9c9c-1c1c1c1c1c1c --role Contributor --scope"
-                " /subscriptions/12345678-1234-1234-1234-123456789012/resourceGroups/prefect-aci-push-pool-rg"
-                " --output json"
-            ),
-            return_json=True,
-        ),
-        call(
-            (
-                "az role assignment create --role Contributor --assignee-object-id"
-                " abf1b3a0-1b1b-4c1c-9c9c-1c1c1c1c1c1c --scope"
-                " /subscriptions/12345678-1234-1234-1234-123456789012/resourceGroups/prefect-aci-push-pool-rg"
-            ),
-            success_message=(
-                "Contributor role assigned to service principal with object ID"
-                " 'abf1b3a0-1b1b-4c1c-9c9c-1c1c1c1c1c1c'"
-            ),
-            failure_message=(
-                "Failed to assign Contributor role to service principal with object ID"
-                " 'abf1b3a0-1b1b-4c1c-9c9c-1c1c1c1c1c1c'"
-            ),
-            ignore_if_exists=True,
-        ),
-        # _create_container_instance
-        call(
-            (
-                "az container list --resource-group prefect-aci-push-pool-rg"
-                " --subscription 12345678-1234-1234-1234-123456789012 --query"
-                " \"[?name=='prefect-aci-push-pool-container']\" --output json"
-            ),
-            return_json=True,
-        ),
-        call(
-            (
-                "az container create --name prefect-aci-push-pool-container"
-                " --resource-group prefect-aci-push-pool-rg --image"
-                " docker.io/prefecthq/prefect:2-latest --location westus --subscription"
-                " 12345678-1234-1234-1234-123456789012 --restart-policy OnFailure"
-                " --output json"
-            ),
-            success_message=(
-                "Container instance 'prefect-aci-push-pool-container' created"
-                " successfully in resource group 'prefect-aci-push-pool-rg' in location"
-                " 'westus' in subscription 'subscription_1'"
-            ),
-            failure_message=(
-                "Failed to create container instance 'prefect-aci-push-pool-container'"
-                " in resource group 'prefect-aci-push-pool-rg' in location 'westus' in"
-                " subscription 'subscription_1'"
-            ),
-            ignore_if_exists=True,
-        ),
-    ]
-
-    provisioner.azure_cli.run_command.assert_has_calls(expected_calls)
-
-    # assert not called
-    unexpected_call = call(
-        (
-            "az ad app credential reset --id 12345678-1234-1234-1234-123456789012"
-            " --append --output json"
-        ),
-        success_message=(
-            "Secret generated for app registration with client ID"
-            " '12345678-1234-1234-1234-123456789012'"
-        ),
-        failure_message=(
-            "Failed to generate secret for app registration with client ID"
-            " '12345678-1234-1234-1234-123456789012'. If you have already generated 2"
-            " secrets for this app registration, please delete one from the"
-            " `prefect-aci-push-pool-app` resource and try again."
-        ),
-        ignore_if_exists=True,
-        return_json=True,
-    )
-    assert (
-        unexpected_call not in provisioner.azure_cli.run_command.mock_calls
-    ), "Unexpected call made: {call}"
-
-    new_base_job_template["variables"]["properties"]["subscription_id"][
-        "default"
-    ] = "12345678-1234-1234-1234-123456789012"
-
-    new_base_job_template["variables"]["properties"]["resource_group_name"][
-        "default"
-    ] = "prefect-aci-push-pool-rg"
-
-    new_base_job_template["variables"]["properties"]["aci_credentials"]["default"][
-        "block_document_id"
-    ] = str(existing_credentials_block)
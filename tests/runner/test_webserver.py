@@ -0,0 +1,53 @@
+from unittest.mock import MagicMock
+
+import pendulum
+import pytest
+from prefect._vendor.fastapi.testclient import TestClient
+
+from prefect.runner.server import build_server
+
+
+@pytest.fixture
+def runner() -> MagicMock:
+    runner = MagicMock()
+    runner.last_polled = pendulum.now("utc")
+    runner._flow_run_process_map = {}
+    return runner
+
+
+@pytest.fixture
+def client(runner) -> TestClient:
+    # Build the app once and reuse the same client (and its underlying
+    # transport) for every request a test makes; entering the client runs the
+    # app's lifespan a single time instead of once per request
+    webserver = build_server(runner)
+    with TestClient(webserver) as client:
+        yield client
+
+
+def test_webserver_health_check_healthy_runner(client: TestClient):
+    response = client.get("/health")
+    assert response.status_code == 200
+    assert response.json() == {"message": "OK"}
+
+
+def test_webserver_health_check_unresponsive_runner(
+    runner: MagicMock, client: TestClient
+):
+    runner.last_polled = pendulum.now("utc").subtract(minutes=5)
+    response = client.get("/health")
+    assert response.status_code == 503
+    assert response.json() == {"message": "Runner is unresponsive at this time"}
+
+
+def test_webserver_run_count(runner: MagicMock, client: TestClient):
+    runner._flow_run_process_map = {"a": {}, "b": {}}
+    response = client.get("/run_count")
+    assert response.status_code == 200
+    assert response.json() == 2
+
+
+def test_webserver_shutdown_stops_runner(runner: MagicMock, client: TestClient):
+    response = client.post("/shutdown")
+    assert response.status_code == 200
+    runner.stop.assert_called_once()